@@ -1,9 +1,11 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class SourceData(BaseModel):
     """Data about a research source."""
 
+    model_config = ConfigDict(defer_build=True)
+
     number: int = Field(description="Citation number")
     title: str | None = Field(default="Untitled", description="Page title")
     url: str = Field(description="Source URL")
@@ -15,7 +17,9 @@ class SourceData(BaseModel):
         return f"[{self.number}] {self.title or 'Untitled'} - {self.url}"
 
 class ResearchContext(BaseModel):
-    model_config = {"arbitrary_types_allowed": True}
+    # Deferred as well: `sources` references SourceData, so building this schema
+    # at import would build SourceData's schema too
+    model_config = {"arbitrary_types_allowed": True, "defer_build": True}
 
     current_step_reasoning: Any = None
     execution_result: str | None = None
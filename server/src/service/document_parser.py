@@ -1,13 +1,16 @@
 import io
 import os
+import shutil
+import subprocess
 import tempfile
+import zipfile
 import chardet
 import magic
 from pathlib import Path
 
 import pdfplumber
 
-from docx import Document
+from lxml import etree
 
 from odf import text, teletype
 from odf.opendocument import load as odf_load
@@ -23,11 +26,20 @@ try:
 except ImportError:
     HAS_EPUB = False
 
+try:
+    from python_calamine import CalamineWorkbook
+    HAS_CALAMINE = True
+except ImportError:
+    HAS_CALAMINE = False
+
+# Утилита для .doc определяется один раз при загрузке модуля
+_DOC_TOOL = shutil.which('antiword') or shutil.which('catdoc')
+
 
 class DocumentTextExtractor:
     """
     Универсальный парсер текста из байтов документа.
-    Поддерживает: txt, pdf, docx, odt, rtf, html, xml, csv, xlsx, epub (опционально), doc (ограниченно).
+    Поддерживает: txt, pdf, docx, odt, rtf, html, xml, csv, xlsx (быстрее с python-calamine), epub (опционально), doc (ограниченно).
     """
 
     def __call__(self, file_bytes: bytes, filename: str = None) -> str:
@@ -99,8 +111,28 @@ class DocumentTextExtractor:
         return '\n\n'.join(text)
 
     def _extract_docx(self, data: bytes) -> str:
-        doc = Document(io.BytesIO(data))
-        return '\n\n'.join([para.text for para in doc.paragraphs if para.text.strip()])
+        # Читаем word/document.xml напрямую и потоково разбираем абзацы <w:p>,
+        # не строя полное дерево объектов python-docx
+        ns = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+        # Как Paragraph.text в python-docx: табуляция - '\t', перенос строки - '\n',
+        # разрыв страницы/колонки (w:br с другим w:type) текста не дает
+        tags = (ns + 't', ns + 'tab', ns + 'br', ns + 'cr')
+        parts = []
+        with zipfile.ZipFile(io.BytesIO(data)) as z, z.open('word/document.xml') as xml:
+            for _, p in etree.iterparse(xml, tag=ns + 'p'):
+                pieces = []
+                for el in p.iter(*tags):
+                    if el.tag == ns + 't':
+                        pieces.append(el.text or '')
+                    elif el.tag == ns + 'tab':
+                        pieces.append('\t')
+                    elif el.tag == ns + 'cr' or el.get(ns + 'type', 'textWrapping') == 'textWrapping':
+                        pieces.append('\n')
+                txt = ''.join(pieces)
+                if txt.strip():
+                    parts.append(txt)
+                p.clear()
+        return '\n\n'.join(parts)
 
     def _extract_odt(self, data: bytes) -> str:
         with tempfile.NamedTemporaryFile(delete=False) as tmp:
@@ -127,16 +159,30 @@ class DocumentTextExtractor:
         return self._extract_txt(data)
 
     def _extract_csv(self, data: bytes) -> str:
-        encoding = chardet.detect(data)['encoding'] or 'utf-8'
-        df = pd.read_csv(io.BytesIO(data), encoding=encoding, on_bad_lines='skip')
-        return df.to_string(index=False)
+        # Сначала пробуем UTF-8 (с BOM или без) — chardet прогоняем по всему файлу
+        # только если декодирование не удалось
+        try:
+            df = pd.read_csv(io.BytesIO(data), encoding='utf-8-sig', on_bad_lines='skip')
+        except UnicodeDecodeError:
+            encoding = chardet.detect(data)['encoding'] or 'utf-8'
+            df = pd.read_csv(io.BytesIO(data), encoding=encoding, encoding_errors='replace', on_bad_lines='skip')
+        return df.to_csv(index=False, lineterminator='\n')
 
     def _extract_xlsx(self, data: bytes) -> str:
-        dfs = pd.read_excel(io.BytesIO(data), sheet_name=None, dtype=str)
+        # Листы читаются по одному, чтобы в памяти не держать все DataFrame сразу
         parts = []
-        for sheet_name, df in dfs.items():
-            parts.append(f"=== Sheet: {sheet_name} ===")
-            parts.append(df.to_string(index=False))
+        if HAS_CALAMINE:
+            wb = CalamineWorkbook.from_filelike(io.BytesIO(data))
+            for sheet_name in wb.sheet_names:
+                parts.append(f"=== Sheet: {sheet_name} ===")
+                rows = wb.get_sheet_by_name(sheet_name).to_python()
+                parts.append('\n'.join('\t'.join(str(c) for c in row) for row in rows))
+        else:
+            with pd.ExcelFile(io.BytesIO(data)) as xls:
+                for sheet_name in xls.sheet_names:
+                    df = xls.parse(sheet_name, dtype=str, header=None)
+                    parts.append(f"=== Sheet: {sheet_name} ===")
+                    parts.append(df.to_csv(sep='\t', index=False, header=False, lineterminator='\n'))
         return '\n\n'.join(parts)
 
     def _extract_epub(self, data: bytes) -> str:
@@ -155,20 +201,16 @@ class DocumentTextExtractor:
             os.unlink(tmp_path)
 
     def _extract_doc(self, data: bytes) -> str:
-        # Для .doc используем внешнюю утилиту, если она есть
+        # Для .doc используем внешнюю утилиту (antiword или catdoc), если она есть
         # Альтернатива: падаем на текст (не идеально)
+        if _DOC_TOOL is None:
+            return self._extract_txt(data)
         try:
-            import subprocess
             with tempfile.NamedTemporaryFile(delete=False, suffix='.doc') as tmp:
                 tmp.write(data)
                 tmp_path = tmp.name
             try:
-                # Попробуем antiword
-                result = subprocess.run(['antiword', tmp_path], capture_output=True, text=True)
-                if result.returncode == 0:
-                    return result.stdout
-                # Или catdoc
-                result = subprocess.run(['catdoc', tmp_path], capture_output=True, text=True)
+                result = subprocess.run([_DOC_TOOL, tmp_path], capture_output=True, text=True, timeout=30, check=False)
                 if result.returncode == 0:
                     return result.stdout
             finally:
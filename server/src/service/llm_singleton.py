@@ -0,0 +1,9 @@
+from functools import lru_cache
+
+from server.src.service.llm_client import LLMClient
+
+
+@lru_cache(maxsize=1)
+def get_llm() -> LLMClient:
+    """Return the process-wide LLMClient so tools share one client and its connection pool."""
+    return LLMClient()
@@ -1,7 +1,36 @@
+import asyncio
+import hashlib
+import re
+import uuid
+from collections import OrderedDict
+
 import httpx
-from typing import List, Optional, Callable
+from typing import ClassVar, Dict, List, Optional, Callable, Union
 from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct, VectorParams, Distance
+from qdrant_client.models import (
+    Distance,
+    PointStruct,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    VectorParams,
+)
+
+from server.src.config.Config import CONFIG
+
+try:
+    import h2  # noqa: F401
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+# Максимум текстов в одном запросе к /v1/embeddings
+EMBEDDING_BATCH_SIZE = 100
+# Максимум одновременных запросов к API эмбеддингов при векторизации документа
+EMBEDDING_CONCURRENCY = 8
+
+# Граница предложения: пробельные символы после . ! ?
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
 
 
 class TextVectorizer:
@@ -10,101 +39,292 @@ class TextVectorizer:
     Работает без локальных ML-библиотек.
     """
 
+    # Общий для всех экземпляров HTTP-клиент: keep-alive и (если есть h2) HTTP/2
+    _http_client: ClassVar[Optional[httpx.AsyncClient]] = None
+    # Клиенты Qdrant по адресу хранилища: локальную папку может открыть только один клиент в процессе
+    # (и только один процесс — при нескольких воркерах нужен qdrant_url)
+    _qdrant_clients: ClassVar[Dict[str, QdrantClient]] = {}
+
     def __init__(
         self,
         vector_size: int,
         max_context_length: int = 40_000,
-        chunk_size: int = 1000,
-        chunk_overlap: int = 200,
+        chunk_size: int = 4000,
+        chunk_overlap: int = 100,
         collection_name: str = "document_chunks",
         timeout: float = 30.0,
+        embed_cache_size: int = 10_000,
+        qdrant_path: str = "./qdrant_storage",
+        qdrant_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        embedding_model: Optional[str] = None,
+        base_url: Optional[str] = None,
     ):
         """
         :param vectorize_fn: функция, которая принимает строку и возвращает список float (вектор)
         :param vector_size: размер вектора (например, 1536 для text-embedding-3-small)
         :param max_context_length: порог длины текста для векторизации
+        :param chunk_size: максимальная длина куска в символах. Крупные куски — меньше
+            запросов к API эмбеддингов, мелкие — точнее поиск (выше recall)
+        :param chunk_overlap: сколько символов хвоста предыдущего куска (целыми
+            предложениями) повторяется в начале следующего
+        :param collection_name: префикс коллекции для текстов без doc_id; к нему добавляется
+            уникальный суффикс, так что у каждого экземпляра своя коллекция
+        :param embed_cache_size: сколько эмбеддингов хранить в LRU-кэше (ключ — хэш текста)
+        :param qdrant_path: папка локального хранилища Qdrant (векторы переживают перезапуск).
+            Папку может открыть только один процесс: если воркеров несколько (например,
+            uvicorn --workers N), укажите qdrant_url
+        :param qdrant_url: адрес удалённого Qdrant; если указан, qdrant_path не используется
+        :param api_key: ключ API эмбеддингов (по умолчанию CONFIG.llm.token)
+        :param embedding_model: модель эмбеддингов (по умолчанию CONFIG.qdrant.model_name)
+        :param base_url: базовый URL OpenAI-совместимого API (по умолчанию CONFIG.llm.url)
         """
         self.vector_size = vector_size
         self.max_context_length = max_context_length
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.collection_name = collection_name
-        self.client = QdrantClient(":memory:")
+        # Клиент Qdrant общий для процесса, поэтому коллекция для текстов без doc_id
+        # у каждого экземпляра своя: иначе пересборка в одном экземпляре ломает поиск в другом
+        self.collection_name = f"{collection_name}_{uuid.uuid4().hex}"
+        self._active_collection: Optional[str] = None
+        self.client = self._get_qdrant_client(qdrant_path, qdrant_url)
         self.chunks: List[str] = []
-        self._vectorized = False
         self.timeout = timeout
+        self.api_key = api_key or CONFIG.llm.token
+        self.embedding_model = embedding_model or CONFIG.qdrant.model_name
+        self.embeddings_url = f"{(base_url or CONFIG.llm.url).rstrip('/')}/embeddings"
+        self.embed_cache_size = embed_cache_size
+        self._embed_cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
 
-    def __call__(self, text: str) -> "TextVectorizer":
+    async def __call__(self, text: str, doc_id: Optional[str] = None) -> "TextVectorizer":
+        """
+        :param text: текст документа
+        :param doc_id: идентификатор документа; если указан, векторы хранятся в отдельной
+            коллекции и при повторном вызове для того же документа переиспользуются
+        """
         if not isinstance(text, str):
             raise TypeError("Input must be a string")
 
         if len(text) <= self.max_context_length:
-            self._vectorized = False
+            self._active_collection = None
             self.chunks = []
             return self
 
-        # Нарезка
-        self.chunks = self._chunk_text(text)
+        # Нарезка. Куски держим в локальной переменной до конца вызова: между await может
+        # начаться другой вызов на этом же экземпляре и перезаписать self.chunks
+        chunks = self._chunk_text(text)
+
+        if doc_id is not None:
+            name = f"doc_{hashlib.blake2b(doc_id.encode(), digest_size=8).hexdigest()}"
+        else:
+            name = self.collection_name
+        # Отпечаток содержимого и параметров нарезки: документ, измененный под тем же doc_id,
+        # не должен получить старые векторы
+        fingerprint = hashlib.blake2b(
+            f"{self.chunk_size}:{self.chunk_overlap}:".encode() + text.encode(), digest_size=16
+        ).hexdigest()
+        # Коллекция документа уже заполнена (в том числе до перезапуска процесса) —
+        # индекс и эмбеддинги не пересобираем
+        if doc_id is not None and self._is_current(name, fingerprint, len(chunks)):
+            self.chunks = chunks
+            self._active_collection = name
+            return self
 
         # Удаляем старую коллекцию
+        self._active_collection = None
         try:
-            self.client.delete_collection(self.collection_name)
+            self.client.delete_collection(name)
         except Exception:
             pass
 
-        # Создаём новую
+        # Создаём новую; int8-квантование сокращает память под векторы в ~4 раза
         self.client.create_collection(
-            collection_name=self.collection_name,
-            vectors_config=VectorParams(size=self.vector_size, distance=Distance.COSINE)
+            collection_name=name,
+            vectors_config=VectorParams(size=self.vector_size, distance=Distance.COSINE),
+            quantization_config=ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True)
+            ),
         )
 
-        # Векторизация и загрузка
-        points = []
-        for i, chunk in enumerate(self.chunks):
-            vector = self.vectorize_fn(chunk)
+        # Векторизация пачками (не больше EMBEDDING_CONCURRENCY запросов одновременно);
+        # каждая пачка загружается в Qdrant сразу по готовности, без промежуточного списка всех точек
+        semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+
+        async def embed_batch(offset: int):
+            async with semaphore:
+                return offset, await self._embed(chunks[offset:offset + EMBEDDING_BATCH_SIZE])
+
+        tasks = [
+            asyncio.create_task(embed_batch(offset))
+            for offset in range(0, len(chunks), EMBEDDING_BATCH_SIZE)
+        ]
+        try:
+            for future in asyncio.as_completed(tasks):
+                offset, vectors = await future
+                # Клиент Qdrant синхронный: загрузка идет в отдельном потоке, чтобы не блокировать
+                # event loop, пока остальные пачки векторизуются
+                await asyncio.to_thread(
+                    self.client.upload_points,
+                    collection_name=name,
+                    points=self._iter_points(chunks, offset, vectors, fingerprint),
+                    batch_size=64,
+                    parallel=1,
+                )
+        except BaseException:
+            # При ошибке (или отмене) оставшиеся запросы не должны висеть без ожидания
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        self.chunks = chunks
+        self._active_collection = name
+        return self
+
+    def close(self) -> None:
+        """Удаляет собственную коллекцию экземпляра (коллекции документов с doc_id остаются)."""
+        if self._active_collection == self.collection_name:
+            self._active_collection = None
+        try:
+            self.client.delete_collection(self.collection_name)
+        except Exception:
+            pass
+
+    def _iter_points(self, chunks: List[str], offset: int, vectors: List[List[float]], fingerprint: str):
+        for i, vector in enumerate(vectors, offset):
             if len(vector) != self.vector_size:
                 raise ValueError(f"Вектор chunk #{i} имеет размер {len(vector)}, ожидался {self.vector_size}")
-            points.append(PointStruct(id=i, vector=vector, payload={"chunk": chunk}))
+            yield PointStruct(id=i, vector=vector, payload={"chunk": chunks[i], "fingerprint": fingerprint})
 
-        self.client.upsert(collection_name=self.collection_name, points=points)
-        self._vectorized = True
-        return self
+    def _is_current(self, name: str, fingerprint: str, chunk_count: int) -> bool:
+        """Коллекция заполнена полностью и построена по тому же тексту и параметрам нарезки."""
+        if not self.client.collection_exists(name) or self.client.count(name).count != chunk_count:
+            return False
+        # Коллекция пересобирается целиком, поэтому достаточно проверить одну точку
+        points = self.client.retrieve(name, ids=[0], with_payload=True)
+        return bool(points) and points[0].payload.get("fingerprint") == fingerprint
+
+    @classmethod
+    def _get_qdrant_client(cls, path: str, url: Optional[str]) -> QdrantClient:
+        key = url or path
+        client = cls._qdrant_clients.get(key)
+        if client is None:
+            client = QdrantClient(url=url, prefer_grpc=True) if url else QdrantClient(path=path)
+            cls._qdrant_clients[key] = client
+        return client
+
+    @classmethod
+    def _get_http_client(cls) -> httpx.AsyncClient:
+        if cls._http_client is None or cls._http_client.is_closed:
+            cls._http_client = httpx.AsyncClient(
+                http2=HAS_HTTP2,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            )
+        return cls._http_client
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """Закрывает общий HTTP-клиент (вызывать при остановке приложения)."""
+        if cls._http_client is not None:
+            await cls._http_client.aclose()
+            cls._http_client = None
 
-    def vectorize_fn(text: str) -> List[float]:
-        response = httpx.post(
-            "https://api.openai.com/v1/embeddings",
+    async def vectorize_fn(self, text: Union[str, List[str]]) -> Union[List[float], List[List[float]]]:
+        """
+        Получает эмбеддинги через API.
+        :param text: строка или список строк (один запрос на весь список)
+        :return: вектор для строки или список векторов в порядке входных текстов
+        """
+        response = await self._get_http_client().post(
+            self.embeddings_url,
             headers={
-                "Authorization": f"Bearer {OPENAI_API_KEY}",
+                "Authorization": f"Bearer {self.api_key}",
                 "Content-Type": "application/json"
             },
-            json={"input": text, "model": OPENAI_EMBEDDING_MODEL},
-            timeout=30.0
+            json={"input": text, "model": self.embedding_model},
+            timeout=self.timeout
         )
         response.raise_for_status()
-        return response.json()["data"][0]["embedding"]
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        if isinstance(text, str):
+            return data[0]["embedding"]
+        return [item["embedding"] for item in data]
+
+
+    async def _embed(self, texts: List[str]) -> List[List[float]]:
+        """Эмбеддинги через LRU-кэш: в API уходят только тексты, которых ещё нет в кэше."""
+        keys = [hashlib.blake2b(t.encode(), digest_size=16).digest() for t in texts]
+        found = {}
+        missing = {}
+        for key, t in zip(keys, texts):
+            vector = self._embed_cache.get(key)
+            if vector is not None:
+                self._embed_cache.move_to_end(key)
+                found[key] = vector
+            else:
+                missing.setdefault(key, t)
 
+        if missing:
+            vectors = await self.vectorize_fn(list(missing.values()))
+            for key, vector in zip(missing, vectors):
+                found[key] = vector
+                self._embed_cache[key] = vector
+                if len(self._embed_cache) > self.embed_cache_size:
+                    self._embed_cache.popitem(last=False)
+
+        return [found[key] for key in keys]
 
     def _chunk_text(self, text: str) -> List[str]:
+        """Жадно упаковывает предложения в куски длиной до chunk_size символов."""
         chunks = []
-        start = 0
-        step = self.chunk_size - self.chunk_overlap
-        while start < len(text):
-            end = start + self.chunk_size
-            chunk = text[start:end]
-            if chunk.strip():
-                chunks.append(chunk)
-            start += step
+        current: List[str] = []
+        length = 0  # длина ' '.join(current)
+
+        for sentence in _SENTENCE_BOUNDARY.split(text):
+            if not sentence or sentence.isspace():
+                continue
+            # Предложение длиннее куска режем с фиксированным шагом
+            if len(sentence) > self.chunk_size:
+                pieces = [sentence[s:s + self.chunk_size] for s in range(0, len(sentence), self.chunk_size)]
+            else:
+                pieces = [sentence]
+
+            for piece in pieces:
+                if current and length + 1 + len(piece) > self.chunk_size:
+                    chunks.append(' '.join(current))
+                    # Перекрытие — только целые предложения из хвоста, влезающие в chunk_overlap
+                    tail: List[str] = []
+                    tail_length = -1
+                    for prev in reversed(current):
+                        if tail_length + 1 + len(prev) > self.chunk_overlap:
+                            break
+                        tail.append(prev)
+                        tail_length += 1 + len(prev)
+                    if tail and tail_length + 1 + len(piece) <= self.chunk_size:
+                        current = tail[::-1]
+                        length = tail_length
+                    else:
+                        current = []
+                        length = 0
+                length += len(piece) + (1 if current else 0)
+                current.append(piece)
+
+        if current:
+            chunks.append(' '.join(current))
         return chunks
 
     def is_vectorized(self) -> bool:
-        return self._vectorized
+        if self._active_collection is None:
+            return False
+        return self.client.collection_exists(self._active_collection) \
+            and self.client.count(self._active_collection).count > 0
 
-    def search(self, query: str, k: int = 5) -> List[dict]:
-        if not self._vectorized:
+    async def search(self, query: str, k: int = 5) -> List[dict]:
+        if self._active_collection is None:
             return []
-        query_vector = self.vectorize_fn(query)
+        query_vector = (await self._embed([query]))[0]
         results = self.client.search(
-            collection_name=self.collection_name,
+            collection_name=self._active_collection,
             query_vector=query_vector,
             limit=k
         )
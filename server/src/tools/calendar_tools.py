@@ -10,7 +10,6 @@ if TYPE_CHECKING:
     from server.src.context.research_context import ResearchContext
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
 
 class CalendarTool:
@@ -36,25 +35,26 @@ class CalendarTool:
 
     async def __call__(self, context: ResearchContext) -> str:
         now = datetime.now()
+        today = now.strftime('%Y-%m-%d')
         logger.info(f"📅 Calendar action: {self.action}")
 
         if self.action == "current_date":
             result = f"Current date and time: {now.strftime('%Y-%m-%d %H:%M:%S %Z')}"
         elif self.action == "add_days":
             target = now + timedelta(days=self.days_offset)
+            days = abs(self.days_offset)
             result = (
-                f"{abs(self.days_offset)} day{'s' if abs(self.days_offset) != 1 else ''} "
-                f"{'from' if self.days_offset >= 0 else 'before'} today ({now.strftime('%Y-%m-%d')}) "
+                f"{days} day{'s' if days != 1 else ''} "
+                f"{'from' if self.days_offset >= 0 else 'before'} today ({today}) "
                 f"is: {target.strftime('%Y-%m-%d')}"
             )
         elif self.action == "timeline_suggestion" and self.task_description:
             # Simple heuristic: 3 phases over 7–14 days
-            start = now.strftime('%Y-%m-%d')
             mid = (now + timedelta(days=5)).strftime('%Y-%m-%d')
             end = (now + timedelta(days=12)).strftime('%Y-%m-%d')
             result = (
                 f"Suggested timeline for: '{self.task_description}'\n"
-                f"- Planning & Research: {start} – {mid}\n"
+                f"- Planning & Research: {today} – {mid}\n"
                 f"- Execution & Drafting: {mid} – {end}\n"
                 f"- Review & Finalize: by {end}"
             )
@@ -65,7 +65,7 @@ class CalendarTool:
             "type": "calendar_info",
             "action": self.action,
             "result": result,
-            "timestamp": datetime.now(),
+            "timestamp": now,
         })
 
         logger.debug(result)
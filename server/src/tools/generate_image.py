@@ -2,17 +2,36 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
+from string import Template
 from typing import TYPE_CHECKING
 
 from pydantic import Field
 
-from server.src.service.llm_client import LLMClient
+from server.src.service.llm_singleton import get_llm
 
 if TYPE_CHECKING:
     from server.src.context.research_context import ResearchContext
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
+
+_FORMAT_INSTRUCTIONS = {
+    "mermaid": "Generate a Mermaid.js flowchart (graph TD) with clear nodes and arrows.",
+    "json": "Output a valid JSON Schema object describing the structure.",
+    "hierarchy": "Use indented bullet points to show parent-child relationships.",
+    None: "Use a clear structured format.",  # unknown format
+}
+
+# One prebuilt prompt per output format
+_PROMPT_TEMPLATES = {
+    fmt: Template(
+        f"{instruction}\n"
+        "Return only the schema, no explanations.\n"
+        "---\n"
+        "Create a $format schema for: '$topic'\n"
+        "Based on: $content_hint"
+    )
+    for fmt, instruction in _FORMAT_INSTRUCTIONS.items()
+}
 
 
 class GenerateSchemaTool:
@@ -36,33 +55,24 @@ class GenerateSchemaTool:
 
     def __init__(self, **data):
         super().__init__(**data)
-        self._llm = LLMClient()
+        self._llm = get_llm()
 
     async def __call__(self, context: ResearchContext) -> str:
-        format_instruction = {
-            "mermaid": "Generate a Mermaid.js flowchart (graph TD) with clear nodes and arrows.",
-            "json": "Output a valid JSON Schema object describing the structure.",
-            "hierarchy": "Use indented bullet points to show parent-child relationships.",
-        }.get(self.format, "Use a clear structured format.")
-
-        prompt = (
-            f"Create a {self.format} schema for: '{self.topic}'\n"
-            f"Based on: {self.content_hint}\n\n"
-            f"{format_instruction}\n"
-            f"Return only the schema, no explanations."
-        )
+        template = _PROMPT_TEMPLATES.get(self.format) or _PROMPT_TEMPLATES[None]
+        prompt = template.substitute(format=self.format, topic=self.topic, content_hint=self.content_hint)
 
         logger.info(f"📐 Generating schema for: '{self.topic}' in {self.format} format")
         schema_output = await self._llm.generate(prompt, max_tokens=500)
+        schema = schema_output.strip()
 
         context.artifacts.append({
             "type": "generated_schema",
             "topic": self.topic,
             "format": self.format,
-            "schema": schema_output.strip(),
+            "schema": schema,
             "timestamp": datetime.now(),
         })
 
-        formatted = f"Schema for '{self.topic}' ({self.format.upper()}):\n\n```{self.format}\n{schema_output.strip()}\n```"
+        formatted = f"Schema for '{self.topic}' ({self.format.upper()}):\n\n```{self.format}\n{schema}\n```"
         logger.debug(formatted)
         return formatted
\ No newline at end of file
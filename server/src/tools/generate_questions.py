@@ -2,18 +2,27 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
+from string import Template
 from typing import TYPE_CHECKING
 
 from pydantic import Field
 
 from server.src.config.Config import CONFIG
-from server.src.service.llm_client import LLMClient
+from server.src.service.llm_singleton import get_llm
 
 if TYPE_CHECKING:
     from server.src.context.research_context import ResearchContext
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
+
+_PROMPT_TEMPLATE = Template(
+    "Generate insightful questions that help explore, analyze, or critically evaluate "
+    "the work below. Return only the questions, numbered, one per line.\n"
+    "---\n"
+    "Number of questions: exactly $question_count\n"
+    "Work title: '$work_title'\n"
+    "Summary:\n\"$work_summary\""
+)
 
 
 class GenerateWorkQuestionsTool:
@@ -37,28 +46,27 @@ class GenerateWorkQuestionsTool:
 
     def __init__(self, **data):
         super().__init__(**data)
-        self._llm = LLMClient()
+        self._llm = get_llm()
 
     async def __call__(self, context: ResearchContext) -> str:
-        prompt = (
-            f"Based on the following work titled '{self.work_title}' with summary:\n"
-            f"\"{self.work_summary}\"\n\n"
-            f"Generate exactly {self.question_count} insightful questions that help explore, "
-            f"analyze, or critically evaluate this work. "
-            f"Return only the questions, numbered, one per line."
+        prompt = _PROMPT_TEMPLATE.substitute(
+            question_count=self.question_count,
+            work_title=self.work_title,
+            work_summary=self.work_summary,
         )
 
         logger.info(f"❓ Generating questions for work: '{self.work_title}'")
         response = await self._llm.generate(prompt, max_tokens=300)
+        questions = response.strip()
 
         timestamp = datetime.now()
         context.artifacts.append({
             "type": "generated_questions",
             "work_title": self.work_title,
-            "questions": response.strip(),
+            "questions": questions,
             "timestamp": timestamp,
         })
 
-        formatted = f"Generated Questions for '{self.work_title}':\n\n{response.strip()}"
+        formatted = f"Generated Questions for '{self.work_title}':\n\n{questions}"
         logger.debug(formatted)
         return formatted
\ No newline at end of file
@@ -2,17 +2,44 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
+from string import Template
 from typing import TYPE_CHECKING
 
 from pydantic import Field
 
-from server.src.service.llm_client import LLMClient
+from server.src.service.llm_singleton import get_llm
 
 if TYPE_CHECKING:
     from server.src.context.research_context import ResearchContext
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
+
+_LENGTH_GUIDES = {
+    "short": "1-2 sentences",
+    "medium": "3-5 sentences",
+    "bullet_points": "3-5 bullet points starting with '-'",
+    None: "brief summary",  # unknown length
+}
+
+
+def _summary_template(length_guide: str, with_focus: bool) -> Template:
+    # Static instructions before the request-specific slots, so the shared prefix
+    # can be served from the provider's prompt cache (same layout in the other tools)
+    return Template(
+        f"Summarize the content below in a {length_guide}. "
+        "Return only the summary, no introduction or markdown.\n"
+        "---\n"
+        + ("Focus on: $focus.\n" if with_focus else "")
+        + "Content:\n$content"
+    )
+
+
+# One prebuilt prompt per (length, has_focus) combination
+_PROMPT_TEMPLATES = {
+    (length, with_focus): _summary_template(guide, with_focus)
+    for length, guide in _LENGTH_GUIDES.items()
+    for with_focus in (False, True)
+}
 
 
 class SummarizeContentTool:
@@ -36,33 +63,24 @@ class SummarizeContentTool:
 
     def __init__(self, **data):
         super().__init__(**data)
-        self._llm = LLMClient()
+        self._llm = get_llm()
 
     async def __call__(self, context: ResearchContext) -> str:
-        length_guide = {
-            "short": "1-2 sentences",
-            "medium": "3-5 sentences",
-            "bullet_points": "3-5 bullet points starting with '-'",
-        }.get(self.length, "brief summary")
-
-        focus_part = f" Focus on: {self.focus}." if self.focus else ""
-        prompt = (
-            f"Summarize the following content in a {length_guide}.{focus_part}\n\n"
-            f"Content:\n{self.content}\n\n"
-            f"Return only the summary, no introduction or markdown."
-        )
+        with_focus = bool(self.focus)
+        template = _PROMPT_TEMPLATES.get((self.length, with_focus)) or _PROMPT_TEMPLATES[(None, with_focus)]
+        prompt = template.substitute(content=self.content, focus=self.focus or "")
 
         logger.info(f"📝 Summarizing content (length: {self.length})")
-        summary = await self._llm.generate(prompt, max_tokens=300)
+        summary = (await self._llm.generate(prompt, max_tokens=300)).strip()
 
         context.artifacts.append({
             "type": "summary",
             "length": self.length,
             "focus": self.focus,
-            "summary": summary.strip(),
+            "summary": summary,
             "timestamp": datetime.now(),
         })
 
-        formatted = f"Summary ({self.length}{f', focus: {self.focus}' if self.focus else ''}):\n\n{summary.strip()}"
+        formatted = f"Summary ({self.length}{f', focus: {self.focus}' if self.focus else ''}):\n\n{summary}"
         logger.debug(formatted)
         return formatted
\ No newline at end of file
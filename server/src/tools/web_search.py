@@ -10,7 +10,6 @@ from server.src.config.Config import CONFIG
 from server.src.service.tavily_search import TavilySearchService
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
 
 class WebSearchTool():
@@ -79,7 +78,9 @@ class WebSearchTool():
         formatted_result += "Search Results (titles, links, short snippets):\n\n"
 
         for source in sources:
-            snippet = source.snippet[:100] + "..." if len(source.snippet) > 100 else source.snippet
+            snippet = source.snippet
+            if len(snippet) > 100:
+                snippet = snippet[:100] + "..."
             formatted_result += f"{str(source)}\n{snippet}\n\n"
 
         context.searches_used += 1
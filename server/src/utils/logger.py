@@ -1,3 +1,4 @@
+import functools
 import sys
 
 import graypy
@@ -6,26 +7,34 @@ import logging
 from config.Config import CONFIG
 from services.context_var import request_id_var
 
+_APP_NAME = CONFIG.logging.app_name
+_GRAYLOG_ENABLED = CONFIG.logging.graylog.enabled
+_GRAYLOG_UDP = CONFIG.logging.graylog.udp
+_GRAYLOG_HOST = CONFIG.logging.graylog.host
+_GRAYLOG_PORT = CONFIG.logging.graylog.port
+_CONSOLE_ENABLED = CONFIG.logging.console.enabled
 
-class GraylogFormatter(logging.Formatter):
-    def format(self, record):
-        record.app_name = CONFIG.logging.app_name
+
+# graypy sends extra record attributes as separate GELF fields (_app_name, _request_id),
+# and the logger name is already included, so no format string is needed for short_message
+class GraylogContextFilter(logging.Filter):
+    def filter(self, record):
+        record.app_name = _APP_NAME
         record.request_id = request_id_var.get()
-        return super().format(record)
+        return True
 
 
-if CONFIG.logging.graylog.enabled:
-    if CONFIG.logging.graylog.udp:
-        graylog_handler = graypy.GELFUDPHandler(CONFIG.logging.graylog.host, CONFIG.logging.graylog.port)
+if _GRAYLOG_ENABLED:
+    if _GRAYLOG_UDP:
+        graylog_handler = graypy.GELFUDPHandler(_GRAYLOG_HOST, _GRAYLOG_PORT)
     else:
-        graylog_handler = graypy.GELFTCPHandler(CONFIG.logging.graylog.host, CONFIG.logging.graylog.port)
+        graylog_handler = graypy.GELFTCPHandler(_GRAYLOG_HOST, _GRAYLOG_PORT)
 
-    graylog_formatter = GraylogFormatter("[%(name)s]: %(message)s")
-    graylog_handler.setFormatter(graylog_formatter)
+    graylog_handler.addFilter(GraylogContextFilter())
 else:
     graylog_handler = None
 
-if CONFIG.logging.console.enabled:
+if _CONSOLE_ENABLED:
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(logging.Formatter(
         "%(asctime)s [%(name)s] %(levelname)s: %(message)s"
@@ -38,7 +47,8 @@ for log, level in CONFIG.logging.levels.items():
     logging.getLogger(log).setLevel(logging.getLevelName(level))
 
 
-def get_logger(name) -> logging:
+@functools.lru_cache(maxsize=None)
+def get_logger(name) -> logging.Logger:
     logger = logging.getLogger(name)
 
     logger.propagate = False  # Global logger should not print messages again.
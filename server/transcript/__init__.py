@@ -4,7 +4,7 @@
 from .main import process_audio_file
 from .whisper_client import WhisperClient, transcribe_file
 from .openrouter_client import OpenRouterClient, process_transcript
-from .database import DatabaseStub, save_to_database
+from .database import DatabaseStub, SqliteDatabase, save_to_database
 
 __all__ = [
     "process_audio_file",
@@ -13,5 +13,6 @@ __all__ = [
     "OpenRouterClient",
     "process_transcript",
     "DatabaseStub",
+    "SqliteDatabase",
     "save_to_database",
 ]
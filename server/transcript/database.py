@@ -1,40 +1,324 @@
 """
-Заглушка для работы с базой данных
-В будущем можно заменить на реальную БД (PostgreSQL, SQLite и т.д.)
+Заглушка для работы с базой данных (журнал JSON Lines или msgpack)
+В будущем можно заменить на реальную БД (PostgreSQL и т.д.); SqliteDatabase - вариант на SQLite
 """
+from contextlib import contextmanager
+from copy import deepcopy
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 import json
+import mmap
+import os
+import sqlite3
+import time
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:  # Windows
+    HAS_FCNTL = False
+
+
+# После скольких удалений журнал переписывается без удаленных записей
+COMPACT_THRESHOLD = 100
+
+# Формат журнала -> имя файла по умолчанию
+DB_FORMATS = {
+    "jsonl": "transcriptions.jsonl",
+    "msgpack": "transcriptions.msgpack",
+}
+
+
+def _dumps_line(record: dict[str, Any]) -> bytes:
+    """Кодирует запись в строку журнала (UTF-8, с переводом строки)"""
+    if HAS_ORJSON:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    return orjson.loads(data) if HAS_ORJSON else json.loads(data)
+
+
+def _load_legacy_json(path: Path) -> list[dict[str, Any]]:
+    """Читает БД старого формата: JSON-массив записей (transcriptions.json)"""
+    data = json.loads(path.read_bytes())
+    if not isinstance(data, list):
+        raise ValueError(f"{path} не похож на БД старого формата: ожидался JSON-массив записей")
+    return data
+
+
+def _to_isoformat(ts: float | str) -> str:
+    """Переводит время создания записи в ISO-строку (старые записи уже хранят строку)"""
+    if isinstance(ts, str):
+        return ts
+    return datetime.fromtimestamp(ts).isoformat()
+
+
+def _for_display(record: dict[str, Any]) -> dict[str, Any]:
+    """
+    Копия записи с created_at в формате ISO.
+    metadata копируется целиком: изменения у вызывающего не должны попадать в кэш
+    """
+    return {
+        **record,
+        "metadata": deepcopy(record["metadata"]),
+        "created_at": _to_isoformat(record["created_at"]),
+    }
 
 
 class DatabaseStub:
-    """Заглушка для БД - сохраняет данные в JSON файл"""
+    """
+    Заглушка для БД - журнал в формате JSON Lines (одна запись на строку)
+    или msgpack (записи подряд, каждая сама задает свою длину).
+    Новые записи дописываются в конец файла, удаление - запись-метка {"id": ..., "_deleted": true}
+    """
 
-    def __init__(self, db_file: str = "transcriptions.json"):
+    def __init__(
+        self,
+        db_file: Optional[str] = None,
+        format: str = "jsonl",
+        import_legacy: bool = True
+    ):
         """
         Инициализация заглушки БД
 
         Args:
-            db_file: Имя файла для хранения данных
+            db_file: Имя файла для хранения данных (по умолчанию зависит от формата).
+                Если указан файл старого формата (.json), журнал ведется рядом
+                в файле с расширением формата, а записи из .json импортируются
+            format: Формат журнала: "jsonl" (читается человеком) или "msgpack"
+                (компактнее и быстрее, нужен пакет msgpack)
+            import_legacy: Импортировать записи из одноименного .json (старый формат -
+                JSON-массив), если журнал пуст
         """
-        self.db_file = Path(__file__).parent / db_file
+        if format not in DB_FORMATS:
+            raise ValueError(f"Неизвестный формат БД: {format}. Доступны: {', '.join(DB_FORMATS)}")
+        if format == "msgpack" and not HAS_MSGPACK:
+            raise ImportError("Для формата msgpack установите пакет msgpack")
+        self.format = format
+        self.db_file = Path(__file__).parent / (db_file or DB_FORMATS[format])
+        self._legacy_file = self.db_file.with_suffix(".json")
+        if self.db_file == self._legacy_file:
+            self.db_file = self.db_file.with_suffix(Path(DB_FORMATS[format]).suffix)
+        self._lock_file = self.db_file.with_suffix(self.db_file.suffix + ".lock")
         self._ensure_db_exists()
+        # Актуальные записи держим в памяти: чтение не обращается к диску,
+        # запись только дописывает строку в журнал.
+        # Словарь ID -> запись сохраняет порядок добавления, поэтому отдельный список не нужен:
+        # поиск и удаление за O(1)
+        self._by_id: dict[int, dict[str, Any]] = {}
+        self._next_id = 1
+        self._tombstones = 0
+        # До какого байта и какой версии файла журнал уже применен к кэшу.
+        # Версия - inode и номер поколения из первой строки журнала ({"_generation": N}),
+        # который увеличивается при каждом сжатии: inode после os.replace может достаться
+        # новому файлу повторно, номер поколения - нет
+        self._offset = 0
+        self._inode = 0
+        self._generation = 0
+        with self._locked():
+            if import_legacy:
+                self._import_legacy()
+            self._load_data()
+
+    def _import_legacy(self) -> None:
+        """Однократно переносит записи из .json старого формата в пустой журнал"""
+        if self.db_file.stat().st_size or not self._legacy_file.exists():
+            return
+        records = _load_legacy_json(self._legacy_file)
+        if records:
+            self._save_data(records)
+            print(f"Импортировано записей из {self._legacy_file.name}: {len(records)}")
 
     def _ensure_db_exists(self) -> None:
         """Создает файл БД если его нет"""
         if not self.db_file.exists():
-            self._save_data([])
+            self.db_file.touch()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """
+        Эксклюзивная блокировка журнала между процессами на время чтения-изменения-записи.
+        Блокируется отдельный .lock файл: при сжатии журнал подменяется новым файлом.
+        Без fcntl (Windows) блокировка не выполняется
+        """
+        with open(self._lock_file, "ab") as lock:
+            if HAS_FCNTL:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def _read_lines(self, start: int = 0) -> Iterator[dict[str, Any]]:
+        """
+        Читает строки журнала как есть (записи и метки удаления), начиная с байта start.
+        Запоминает, до какого байта и какой версии файла журнал прочитан.
+        Недописанная последняя запись (процесс упал посреди записи) отрезается с предупреждением;
+        повреждение в середине журнала приводит к исключению
+        """
+        torn_at = None  # с какого байта начинается недописанная последняя запись
+        missing_newline = False  # последняя строка цела, но без перевода строки
+        with open(self.db_file, "rb") as f:
+            st = os.fstat(f.fileno())
+            self._inode = st.st_ino
+            self._offset = st.st_size
+            if st.st_size <= start:
+                return
+
+            if self.format == "msgpack":
+                f.seek(start)
+                unpacker = msgpack.Unpacker(f, raw=False)
+                end = start  # конец последней целой записи
+                for record in unpacker:
+                    end = start + unpacker.tell()
+                    yield record
+                # Unpacker останавливается на неполной последней записи, не выбрасывая ошибку
+                if end < st.st_size:
+                    torn_at = end
+            else:
+                # Файл отображается в память (mmap): строки берутся прямо из отображения,
+                # без копирования всего журнала в bytes и без декодирования TextIOWrapper
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    mm.seek(start)
+                    while True:
+                        pos = mm.tell()
+                        line = mm.readline()
+                        if not line:
+                            break
+                        if not line.strip():
+                            continue
+                        if line.endswith(b"\n"):
+                            yield _loads(line)
+                            continue
+                        # Последняя строка без перевода строки: запись могла оборваться
+                        try:
+                            record = _loads(line)
+                        except ValueError:
+                            torn_at = pos
+                            break
+                        missing_newline = True
+                        yield record
+
+        if torn_at is not None:
+            os.truncate(self.db_file, torn_at)
+            self._offset = torn_at
+            print(
+                f"Предупреждение: в {self.db_file.name} отрезана недописанная последняя запись "
+                f"({st.st_size - torn_at} байт)"
+            )
+        elif missing_newline:
+            # Иначе следующая запись склеится с последней строкой
+            with open(self.db_file, "ab") as f:
+                f.write(b"\n")
+            self._offset += 1
+
+    def _load_data(self, start: int = 0) -> None:
+        """
+        Применяет журнал к кэшу: start=0 - полная загрузка, иначе только строки после start.
+        За тот же проход восстанавливает счетчик ID и число меток удаления
+        """
+        if start == 0:
+            self._by_id = {}
+            self._next_id = 1
+            self._tombstones = 0
+            self._generation = 0
+        for line in self._read_lines(start):
+            if "_generation" in line:
+                self._generation = line["_generation"]
+                continue
+            # ID берется по всем строкам журнала, включая метки удаления,
+            # чтобы ID удаленной записи не выдавался повторно
+            self._next_id = max(self._next_id, line["id"] + 1)
+            if line.get("_deleted"):
+                self._by_id.pop(line["id"], None)
+                self._tombstones += 1
+            else:
+                self._by_id[line["id"]] = line
+
+    def _sync(self) -> None:
+        """
+        Подхватывает изменения журнала, сделанные другими процессами (вызывать под блокировкой):
+        дописанные строки применяются к кэшу, после сжатия журнал перечитывается целиком
+        """
+        st = self.db_file.stat()
+        if st.st_ino != self._inode or st.st_size < self._offset \
+                or self._read_generation() != self._generation:
+            self._load_data()
+        elif st.st_size > self._offset:
+            self._load_data(self._offset)
+
+    def _read_generation(self) -> int:
+        """Номер поколения журнала из его первой строки (0 - журнал еще не сжимался)"""
+        with open(self.db_file, "rb") as f:
+            try:
+                if self.format == "msgpack":
+                    first = next(msgpack.Unpacker(f, raw=False), None)
+                else:
+                    first = _loads(f.readline()) if f.peek(1) else None
+            except ValueError:  # недописанная запись - разберется полная перезагрузка
+                return -1
+        return first.get("_generation", 0) if isinstance(first, dict) else 0
+
+    def _encode(self, record: dict[str, Any]) -> bytes:
+        """Кодирует одну запись журнала в формате БД"""
+        if self.format == "msgpack":
+            return msgpack.packb(record, use_bin_type=True)
+        return _dumps_line(record)
+
+    def _append_record(self, record: dict[str, Any]) -> None:
+        """Дописывает одну строку в конец журнала"""
+        self._append_records([record])
 
-    def _load_data(self) -> list[dict[str, Any]]:
-        """Загружает данные из файла"""
-        with open(self.db_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+    def _append_records(self, records: list[dict[str, Any]]) -> None:
+        """Дописывает строки в конец журнала одним вызовом write"""
+        payload = b"".join(self._encode(record) for record in records)
+        with open(self.db_file, "ab") as f:
+            f.write(payload)
+        self._offset += len(payload)
 
     def _save_data(self, data: list[dict[str, Any]]) -> None:
-        """Сохраняет данные в файл"""
-        with open(self.db_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        """Переписывает журнал целиком (используется при сжатии)"""
+        # Весь журнал кодируется заранее и пишется одним вызовом write.
+        # Пишем во временный файл и атомарно подменяем им журнал:
+        # при сбое посреди записи старый журнал остается целым
+        payload = b"".join(self._encode(record) for record in data)
+        tmp_file = self.db_file.with_suffix(self.db_file.suffix + ".tmp")
+        with open(tmp_file, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.db_file)
+        st = self.db_file.stat()
+        self._inode = st.st_ino
+        self._offset = st.st_size
+
+    def compact(self) -> None:
+        """Сжимает журнал: убирает удаленные записи и метки удаления"""
+        with self._locked():
+            self._sync()
+            self._compact()
+
+    def _compact(self) -> None:
+        self._generation += 1
+        data = [{"_generation": self._generation}, *self._by_id.values()]
+        last_id = self._next_id - 1
+        if last_id and data[-1].get("id") != last_id:
+            # Метка последнего ID сохраняется, чтобы после перезапуска он не выдался снова
+            data.append({"id": last_id, "_deleted": True})
+        self._save_data(data)
+        self._tombstones = 0
 
     def save_transcription(
         self,
@@ -55,23 +339,274 @@ class DatabaseStub:
         Returns:
             ID записи
         """
-        data = self._load_data()
+        # ID выдается под блокировкой после синхронизации с журналом,
+        # поэтому параллельные процессы не получат одинаковый ID
+        with self._locked():
+            self._sync()
+            record = self._new_record(audio_file, transcript, ai_response, metadata)
+            self._append_record(record)
+            self._add_to_cache([record])
+
+        print(f"Запись сохранена в БД (ID: {record['id']})")
+        return record["id"]
+
+    def save_many(self, records: list[dict[str, Any]]) -> list[int]:
+        """
+        Сохраняет несколько транскрипций за одну запись в файл
+
+        Args:
+            records: Список словарей с ключами audio_file, transcript
+                и необязательными ai_response, metadata
+
+        Returns:
+            ID записей в порядке входного списка
+        """
+        if not records:
+            return []
+        with self._locked():
+            self._sync()
+            new_records = [
+                self._new_record(
+                    r["audio_file"],
+                    r["transcript"],
+                    r.get("ai_response"),
+                    r.get("metadata"),
+                )
+                for r in records
+            ]
+            self._append_records(new_records)
+            self._add_to_cache(new_records)
 
-        # Создаем новую запись
+        print(f"Сохранено записей в БД: {len(new_records)}")
+        return [r["id"] for r in new_records]
+
+    def _new_record(
+        self,
+        audio_file: str,
+        transcript: str,
+        ai_response: Optional[str],
+        metadata: Optional[dict[str, Any]]
+    ) -> dict[str, Any]:
+        """Создает новую запись и резервирует для нее ID"""
         record = {
-            "id": len(data) + 1,
+            "id": self._next_id,
             "audio_file": audio_file,
             "transcript": transcript,
             "ai_response": ai_response,
-            "metadata": metadata or {},
-            "created_at": datetime.now().isoformat()
+            # Копия: изменения словаря у вызывающего не должны попадать в кэш мимо журнала
+            "metadata": deepcopy(metadata) if metadata else {},
+            # Время хранится числом (секунды epoch), в ISO переводится только при чтении
+            "created_at": time.time()
         }
+        self._next_id += 1
+        return record
 
-        data.append(record)
-        self._save_data(data)
+    def _add_to_cache(self, records: list[dict[str, Any]]) -> None:
+        """Добавляет сохраненные записи в кэш"""
+        for record in records:
+            self._by_id[record["id"]] = record
 
-        print(f"Запись сохранена в БД (ID: {record['id']})")
-        return record["id"]
+    def get_transcription(self, record_id: int) -> Optional[dict[str, Any]]:
+        """
+        Получает запись по ID
+
+        Args:
+            record_id: ID записи
+
+        Returns:
+            Запись или None если не найдена
+        """
+        record = self._by_id.get(record_id)
+        return _for_display(record) if record is not None else None
+
+    def get_all_transcriptions(self) -> list[dict[str, Any]]:
+        """
+        Получает все записи
+
+        Returns:
+            Список всех записей
+        """
+        return list(self.iter_transcriptions())
+
+    def iter_transcriptions(self) -> Iterator[dict[str, Any]]:
+        """
+        Перебирает записи по одной, не собирая их в список
+
+        Returns:
+            Итератор по записям (копии готовятся по мере перебора)
+        """
+        # Снимок ссылок на записи: удаление или перезагрузка кэша во время перебора
+        # не ломает итератор, а сами записи копируются по мере перебора
+        for record in list(self._by_id.values()):
+            yield _for_display(record)
+
+    def delete_transcription(self, record_id: int) -> bool:
+        """
+        Удаляет запись по ID
+
+        Args:
+            record_id: ID записи
+
+        Returns:
+            True если запись удалена, False если не найдена
+        """
+        with self._locked():
+            self._sync()
+            if self._by_id.pop(record_id, None) is None:
+                return False
+
+            self._append_record({"id": record_id, "_deleted": True})
+            self._tombstones += 1
+            if self._tombstones >= COMPACT_THRESHOLD:
+                self._compact()
+
+        print(f"Запись {record_id} удалена из БД")
+        return True
+
+
+def convert_database(
+    source: DatabaseStub | str,
+    format: str,
+    db_file: Optional[str] = None
+) -> DatabaseStub:
+    """
+    Переносит записи в новую БД другого формата (ID сохраняются)
+
+    Args:
+        source: Исходная БД или имя файла старого формата (JSON-массив, transcriptions.json)
+        format: Формат новой БД
+        db_file: Имя файла новой БД (по умолчанию зависит от формата)
+
+    Returns:
+        Новая БД с теми же записями
+
+    Raises:
+        ValueError: Если файл новой БД уже содержит записи
+    """
+    if isinstance(source, DatabaseStub):
+        # Подхватываем записи, добавленные другими процессами после открытия source
+        with source._locked():
+            source._sync()
+            records = dict(source._by_id)
+            next_id = source._next_id
+    else:
+        records = {r["id"]: r for r in _load_legacy_json(Path(__file__).parent / source)}
+        next_id = max(records, default=0) + 1
+
+    target = DatabaseStub(db_file, format=format, import_legacy=False)
+    with target._locked():
+        target._sync()
+        if target.db_file.stat().st_size:
+            raise ValueError(f"Файл {target.db_file} уже содержит записи")
+        target._by_id = records
+        target._next_id = next_id
+        target._compact()
+    return target
+
+
+class SqliteDatabase:
+    """
+    БД на SQLite с тем же интерфейсом, что и DatabaseStub.
+    Поиск по ID идет по первичному ключу, вставка и удаление не переписывают файл,
+    журнал WAL обеспечивает атомарность записи
+    """
+
+    def __init__(self, db_file: str = "transcriptions.db"):
+        """
+        Инициализация БД
+
+        Args:
+            db_file: Имя файла SQLite
+        """
+        self.db_file = Path(__file__).parent / db_file
+        # Автокоммит: каждая команда - отдельная транзакция, пакеты оборачиваются в BEGIN/COMMIT
+        self._conn = sqlite3.connect(self.db_file, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # AUTOINCREMENT: ID удаленной записи не выдается повторно, как и в DatabaseStub
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS transcriptions ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "audio_file TEXT NOT NULL, "
+            "transcript TEXT NOT NULL, "
+            "ai_response TEXT, "
+            "metadata TEXT NOT NULL, "
+            "created_at REAL NOT NULL)"
+        )
+
+    def close(self) -> None:
+        """Закрывает соединение с БД"""
+        self._conn.close()
+
+    def _insert(
+        self,
+        audio_file: str,
+        transcript: str,
+        ai_response: Optional[str],
+        metadata: Optional[dict[str, Any]]
+    ) -> int:
+        cursor = self._conn.execute(
+            "INSERT INTO transcriptions (audio_file, transcript, ai_response, metadata, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (audio_file, transcript, ai_response, json.dumps(metadata or {}, ensure_ascii=False), time.time()),
+        )
+        return cursor.lastrowid
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> dict[str, Any]:
+        record = dict(row)
+        record["metadata"] = json.loads(record["metadata"])
+        return _for_display(record)
+
+    def save_transcription(
+        self,
+        audio_file: str,
+        transcript: str,
+        ai_response: Optional[str] = None,
+        metadata: Optional[dict[str, Any]] = None
+    ) -> int:
+        """
+        Сохраняет результаты транскрипции в БД
+
+        Args:
+            audio_file: Имя аудио файла
+            transcript: Текст транскрипции
+            ai_response: Ответ от AI модели (опционально)
+            metadata: Дополнительные метаданные (опционально)
+
+        Returns:
+            ID записи
+        """
+        record_id = self._insert(audio_file, transcript, ai_response, metadata)
+        print(f"Запись сохранена в БД (ID: {record_id})")
+        return record_id
+
+    def save_many(self, records: list[dict[str, Any]]) -> list[int]:
+        """
+        Сохраняет несколько транскрипций в одной транзакции
+
+        Args:
+            records: Список словарей с ключами audio_file, transcript
+                и необязательными ai_response, metadata
+
+        Returns:
+            ID записей в порядке входного списка
+        """
+        if not records:
+            return []
+        self._conn.execute("BEGIN")
+        try:
+            ids = [
+                self._insert(r["audio_file"], r["transcript"], r.get("ai_response"), r.get("metadata"))
+                for r in records
+            ]
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+        print(f"Сохранено записей в БД: {len(ids)}")
+        return ids
 
     def get_transcription(self, record_id: int) -> Optional[dict[str, Any]]:
         """
@@ -83,11 +618,8 @@ class DatabaseStub:
         Returns:
             Запись или None если не найдена
         """
-        data = self._load_data()
-        for record in data:
-            if record["id"] == record_id:
-                return record
-        return None
+        row = self._conn.execute("SELECT * FROM transcriptions WHERE id = ?", (record_id,)).fetchone()
+        return self._to_record(row) if row is not None else None
 
     def get_all_transcriptions(self) -> list[dict[str, Any]]:
         """
@@ -96,7 +628,17 @@ class DatabaseStub:
         Returns:
             Список всех записей
         """
-        return self._load_data()
+        return list(self.iter_transcriptions())
+
+    def iter_transcriptions(self) -> Iterator[dict[str, Any]]:
+        """
+        Перебирает записи по одной, не собирая их в список
+
+        Returns:
+            Итератор по записям в порядке ID
+        """
+        for row in self._conn.execute("SELECT * FROM transcriptions ORDER BY id"):
+            yield self._to_record(row)
 
     def delete_transcription(self, record_id: int) -> bool:
         """
@@ -108,20 +650,31 @@ class DatabaseStub:
         Returns:
             True если запись удалена, False если не найдена
         """
-        data = self._load_data()
-        original_length = len(data)
-        data = [r for r in data if r["id"] != record_id]
+        cursor = self._conn.execute("DELETE FROM transcriptions WHERE id = ?", (record_id,))
+        if cursor.rowcount == 0:
+            return False
+
+        print(f"Запись {record_id} удалена из БД")
+        return True
+
+
+# Глобальный экземпляр БД создается при первом обращении,
+# а не при импорте модуля (импорт не трогает файловую систему)
+_db: Optional[DatabaseStub] = None
 
-        if len(data) < original_length:
-            self._save_data(data)
-            print(f"Запись {record_id} удалена из БД")
-            return True
 
-        return False
+def _get_db() -> DatabaseStub:
+    global _db
+    if _db is None:
+        _db = DatabaseStub()
+    return _db
 
 
-# Глобальный экземпляр БД
-db = DatabaseStub()
+def __getattr__(name: str) -> Any:
+    # Совместимость со старым обращением database.db
+    if name == "db":
+        return _get_db()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def save_to_database(
@@ -142,4 +695,4 @@ def save_to_database(
     Returns:
         ID записи
     """
-    return db.save_transcription(audio_file, transcript, ai_response, metadata)
+    return _get_db().save_transcription(audio_file, transcript, ai_response, metadata)
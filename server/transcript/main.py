@@ -7,15 +7,52 @@
 4. Обработка через OpenRouter API
 5. Возврат результата
 """
+from __future__ import annotations
+
 import argparse
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from config import validate_config
 from database import save_to_database
-from openrouter_client import OpenRouterClient
-from whisper_client import WhisperClient
+
+if TYPE_CHECKING:
+    from openrouter_client import OpenRouterClient
+    from whisper_client import WhisperClient
+
+# Разделители для вывода в консоль
+_SEP_EQ = "=" * 60
+_SEP_DASH = "-" * 60
+
+# Клиенты API создаются один раз и переиспользуются между вызовами process_audio_file
+# (общие HTTP-соединения). Импорт - при первом обращении, чтобы запуск с --help их не загружал
+_whisper: Optional[WhisperClient] = None
+_openrouter: Optional[OpenRouterClient] = None
+
+
+def _get_whisper_client() -> WhisperClient:
+    global _whisper
+    if _whisper is None:
+        from whisper_client import WhisperClient
+        _whisper = WhisperClient()
+    return _whisper
+
+
+def _get_openrouter_client() -> OpenRouterClient:
+    global _openrouter
+    if _openrouter is None:
+        from openrouter_client import OpenRouterClient
+        _openrouter = OpenRouterClient()
+    return _openrouter
+
+
+def _flush(lines: list[str]) -> None:
+    """Выводит накопленные строки одним вызовом write (как последовательность print)"""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+        lines.clear()
 
 
 def process_audio_file(
@@ -44,62 +81,71 @@ def process_audio_file(
         ValueError: Если не настроены API ключи
         Exception: При других ошибках
     """
-    print("\n" + "=" * 60)
-    print("Начало обработки аудио файла")
-    print("=" * 60 + "\n")
+    # Строки копятся в буфере и выводятся одним write на шаг;
+    # буфер сбрасывается перед вызовами клиентов, которые печатают сами
+    out: list[str] = []
+
+    out.append("\n" + _SEP_EQ)
+    out.append("Начало обработки аудио файла")
+    out.append(_SEP_EQ + "\n")
 
     audio_path = Path(audio_file_path)
-    print(f"Файл: {audio_path.name}")
-    print(f"Размер: {audio_path.stat().st_size / 1024 / 1024:.2f} MB\n")
+    file_size = audio_path.stat().st_size
+    out.append(f"Файл: {audio_path.name}")
+    out.append(f"Размер: {file_size / 1024 / 1024:.2f} MB\n")
 
     # Шаг 1: Транскрипция через Whisper
-    print("Шаг 1/4: Транскрипция аудио через Whisper API")
-    print("-" * 60)
-    whisper_client = WhisperClient()
+    out.append("Шаг 1/4: Транскрипция аудио через Whisper API")
+    out.append(_SEP_DASH)
+    _flush(out)
+    whisper_client = _get_whisper_client()
     transcript = whisper_client.transcribe_audio(audio_path, language=language)
-    print(f"Транскрипция готова!\n")
+    out.append(f"Транскрипция готова!\n")
 
     # Показываем превью транскрипции
     preview_length = 200
     if len(transcript) > preview_length:
-        print(f"Превью транскрипции: {transcript[:preview_length]}...\n")
+        out.append(f"Превью транскрипции: {transcript[:preview_length]}...\n")
     else:
-        print(f"Транскрипция: {transcript}\n")
+        out.append(f"Транскрипция: {transcript}\n")
 
     # Шаг 2: Обработка через OpenRouter
-    print("Шаг 2/4: Обработка транскрипции через OpenRouter API")
-    print("-" * 60)
-    openrouter_client = OpenRouterClient()
+    out.append("Шаг 2/4: Обработка транскрипции через OpenRouter API")
+    out.append(_SEP_DASH)
+    _flush(out)
+    openrouter_client = _get_openrouter_client()
     ai_response = openrouter_client.process_text(
         text=transcript,
         prompt=custom_prompt
     )
-    print(f"Обработка завершена!\n")
+    out.append(f"Обработка завершена!\n")
 
     # Показываем превью ответа AI
     if len(ai_response) > preview_length:
-        print(f"Превью ответа: {ai_response[:preview_length]}...\n")
+        out.append(f"Превью ответа: {ai_response[:preview_length]}...\n")
     else:
-        print(f"Ответ AI: {ai_response}\n")
+        out.append(f"Ответ AI: {ai_response}\n")
 
     # Шаг 3: Сохранение в БД
     db_id = None
     if save_to_db:
-        print("Шаг 3/4: Сохранение в базу данных")
-        print("-" * 60)
+        out.append("Шаг 3/4: Сохранение в базу данных")
+        out.append(_SEP_DASH)
+        _flush(out)
         db_id = save_to_database(
             audio_file=audio_path.name,
             transcript=transcript,
             ai_response=ai_response,
             metadata={
-                "file_size": audio_path.stat().st_size,
+                "file_size": file_size,
                 "language": language,
             }
         )
-        print()
+        out.append("")
 
-    print("Шаг 4/4: Готово!")
-    print("=" * 60 + "\n")
+    out.append("Шаг 4/4: Готово!")
+    out.append(_SEP_EQ + "\n")
+    _flush(out)
 
     result = {
         "transcript": transcript,
@@ -157,22 +203,23 @@ def main() -> None:
         )
 
         # Выводим полные результаты
-        print("\n" + "=" * 60)
-        print("ПОЛНЫЕ РЕЗУЛЬТАТЫ")
-        print("=" * 60 + "\n")
-
-        print("ТРАНСКРИПЦИЯ:")
-        print("-" * 60)
-        print(result["transcript"])
-        print("\n")
-
-        print("ОТВЕТ AI:")
-        print("-" * 60)
-        print(result["ai_response"])
-        print("\n")
+        out = [
+            "\n" + _SEP_EQ,
+            "ПОЛНЫЕ РЕЗУЛЬТАТЫ",
+            _SEP_EQ + "\n",
+            "ТРАНСКРИПЦИЯ:",
+            _SEP_DASH,
+            result["transcript"],
+            "\n",
+            "ОТВЕТ AI:",
+            _SEP_DASH,
+            result["ai_response"],
+            "\n",
+        ]
 
         if "db_id" in result:
-            print(f"ID записи в БД: {result['db_id']}\n")
+            out.append(f"ID записи в БД: {result['db_id']}\n")
+        _flush(out)
 
     except FileNotFoundError as e:
         print(f"\nОшибка: {e}", file=sys.stderr)
@@ -79,11 +79,15 @@ class OpenRouterClient:
                 "content": system_prompt
             })
 
-        # Добавляем пользовательский промпт с текстом
-        user_message = f"{prompt}\n\n{text}"
+        # Промпт и текст передаем отдельными сообщениями: неизменный префикс
+        # (системный промпт + инструкция) может кэшироваться провайдером
         messages.append({
             "role": "user",
-            "content": user_message
+            "content": prompt
+        })
+        messages.append({
+            "role": "user",
+            "content": text
         })
 
         print(f"Отправка запроса в OpenRouter (модель: {self.model})...")
@@ -1,10 +1,12 @@
 """
 Клиент для работы с OpenAI Whisper API
 """
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from config import OPENAI_API_KEY, OPENROUTER_BASE_URL
 
@@ -24,6 +26,14 @@ class WhisperClient:
             raise ValueError("OpenAI API key не найден. Установите OPENAI_API_KEY в .env")
 
         self.client = OpenAI(api_key=self.api_key, base_url=OPENROUTER_BASE_URL)
+        self._async_client: Optional[AsyncOpenAI] = None
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """Асинхронный клиент API (создается при первом обращении и переиспользуется)"""
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(api_key=self.api_key, base_url=OPENROUTER_BASE_URL)
+        return self._async_client
 
     def transcribe_audio(
         self,
@@ -79,6 +89,84 @@ class WhisperClient:
             print(f"Ошибка при транскрипции: {e}")
             raise
 
+    async def transcribe_audio_async(
+        self,
+        audio_file_path: str | Path,
+        language: str = "ru",
+        response_format: str = "text"
+    ) -> str:
+        """
+        Асинхронная версия transcribe_audio: чтение файла выполняется в отдельном
+        потоке, а загрузка в API не блокирует event loop
+
+        Args:
+            audio_file_path: Путь к аудио файлу (mp3, mp4, wav, и т.д.)
+            language: Язык аудио (по умолчанию "ru" - русский)
+            response_format: Формат ответа ("text", "json", "srt", "vtt")
+
+        Returns:
+            Текст транскрипции
+
+        Raises:
+            FileNotFoundError: Если файл не найден
+            Exception: При ошибке API
+        """
+        audio_path = Path(audio_file_path)
+
+        if not audio_path.exists():
+            raise FileNotFoundError(f"Аудио файл не найден: {audio_path}")
+
+        print(f"Отправка файла {audio_path.name} в Whisper API...")
+
+        try:
+            audio_data = await asyncio.to_thread(audio_path.read_bytes)
+
+            transcript = await self.async_client.audio.transcriptions.create(
+                model="whisper-1",
+                file=(audio_path.name, audio_data),
+                language=language,
+                response_format=response_format
+            )
+
+            if isinstance(transcript, str):
+                result = transcript
+            else:
+                result = transcript.text  # type: ignore
+
+            print(f"Транскрипция успешно получена ({len(result)} символов)")
+            return result
+
+        except Exception as e:
+            print(f"Ошибка при транскрипции: {e}")
+            raise
+
+    def transcribe_many(
+        self,
+        audio_file_paths: list[str | Path],
+        language: str = "ru",
+        max_concurrent: int = 8
+    ) -> list[str | Exception]:
+        """
+        Транскрибирует несколько аудио файлов параллельно
+
+        Args:
+            audio_file_paths: Пути к аудио файлам
+            language: Язык аудио (по умолчанию "ru" - русский)
+            max_concurrent: Максимум одновременных запросов к API
+
+        Returns:
+            Список транскрипций в порядке входных файлов; если файл обработать
+            не удалось, на его месте стоит исключение
+        """
+        def transcribe_one(audio_file_path: str | Path) -> str | Exception:
+            try:
+                return self.transcribe_audio(audio_file_path, language=language)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max_concurrent) as pool:
+            return list(pool.map(transcribe_one, audio_file_paths))
+
 
 def transcribe_file(file_path: str | Path, language: str = "ru") -> str:
     """